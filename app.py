@@ -1,6 +1,7 @@
+import functools
 import streamlit as st
-import pandas as pd
 import utils
+from model_router import BudgetExceeded, UsageTracker
 
 # Set page config
 st.set_page_config(
@@ -11,7 +12,10 @@ st.set_page_config(
 )
 
 # Custom CSS for modern UI
-def apply_custom_css(is_dark_mode):
+# The stylesheet is built once per theme and injected as a single block, since
+# Streamlit re-executes this script (and re-sends every element) on each rerun.
+@functools.lru_cache(maxsize=2)
+def build_custom_css(is_dark_mode):
     if is_dark_mode:
         bg_color = "#0e1117"
         text_color = "#fafafa"
@@ -27,7 +31,7 @@ def apply_custom_css(is_dark_mode):
         card_bg = "#f0f2f6"
         border_color = "#cccccc"
         
-    st.markdown(f"""
+    return f"""
     <style>
         /* Main App Background and Text */
         .stApp {{
@@ -107,8 +111,93 @@ def apply_custom_css(is_dark_mode):
         code {{
             color: #d63384; /* Default pinkish for code */
         }}
+        
+        /* Navigation Menu: tab container */
+        .stTabs [data-baseweb="tab-list"] {{
+            gap: 10px;
+            background-color: transparent;
+            border-bottom: none;
+        }}
+        
+        /* Style individual tabs */
+        .stTabs [data-baseweb="tab"] {{
+            height: 50px;
+            white-space: pre-wrap;
+            background-color: #262730;
+            border-radius: 10px;
+            color: #fafafa;
+            font-weight: 600;
+            padding: 0 20px;
+            border: 1px solid #444;
+            transition: all 0.3s ease;
+        }}
+        
+        /* Hover effect */
+        .stTabs [data-baseweb="tab"]:hover {{
+            background-color: #333;
+            border-color: #666;
+            color: #ff4b4b;
+        }}
+        
+        /* Active tab style */
+        .stTabs [aria-selected="true"] {{
+            background-color: #ff4b4b !important;
+            color: white !important;
+            border-color: #ff4b4b !important;
+        }}
+        
+        /* Remove default focus outline */
+        .stTabs [data-baseweb="tab"]:focus {{
+            outline: none;
+        }}
     </style>
-    """, unsafe_allow_html=True)
+    """
+
+def apply_custom_css(is_dark_mode):
+    st.markdown(build_custom_css(is_dark_mode), unsafe_allow_html=True)
+
+# Download payloads are rendered once per table/review and reused across reruns,
+# so ReportLab / python-docx only run when the content actually changes.
+# st.cache_data is shared by all sessions, so entries are bounded and expire.
+DOWNLOAD_CACHE = dict(show_spinner=False, max_entries=32, ttl=3600)
+
+@st.cache_data(**DOWNLOAD_CACHE)
+def cached_pdf_download(df):
+    return utils.create_pdf_download(df).getvalue()
+
+@st.cache_data(**DOWNLOAD_CACHE)
+def cached_docx_download(df):
+    return utils.create_docx_download(df).getvalue()
+
+@st.cache_data(**DOWNLOAD_CACHE)
+def cached_columnar_download(df, fmt):
+    exporters = {
+        "csv": utils.create_csv_download,
+        "xlsx": utils.create_xlsx_download,
+        "parquet": utils.create_parquet_download,
+    }
+    return exporters[fmt](df).getvalue()
+
+@st.cache_data(**DOWNLOAD_CACHE)
+def cached_review_docx(review_text):
+    return utils.create_review_docx(review_text).getvalue()
+
+# Columnar exports: label -> (format key, file extension / mime type)
+COLUMNAR_FORMATS = {
+    "CSV": ("csv", "text/csv"),
+    "XLSX": ("xlsx", "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"),
+    "Parquet": ("parquet", "application/vnd.apache.parquet"),
+}
+
+def columnar_download(df, file_stem, key, label=""):
+    # Payloads are only built once a format is chosen, so pyarrow / xlsxwriter
+    # are not imported for users who never export data
+    fmt = st.selectbox("Export data as", list(COLUMNAR_FORMATS), index=None,
+                       placeholder="Choose CSV, XLSX or Parquet...", key=key)
+    if fmt:
+        ext, mime = COLUMNAR_FORMATS[fmt]
+        data = cached_columnar_download(df, ext)
+        st.download_button(f"Download {label}{fmt}", data, f"{file_stem}.{ext}", mime, key=f"{key}_download")
 
 def main():
     st.title("📚 Research Gap AI Agent")
@@ -146,6 +235,11 @@ def main():
         
         api_key = st.session_state.api_key
         
+        # Per-session Gemini usage accounting and budget
+        if "usage" not in st.session_state:
+            st.session_state.usage = UsageTracker()
+        usage = st.session_state.usage
+        
         st.divider()
         st.header("Upload Documents")
         uploaded_files = st.file_uploader("Upload PDF or DOCX files", type=['pdf', 'docx', 'doc'], accept_multiple_files=True)
@@ -170,38 +264,56 @@ def main():
             
         # Process Button
         if st.button("Analyze Papers"):
+            budget_message = usage.check()
             if not (run_gap_analysis or run_lit_review):
                 st.warning("Please select at least one analysis option.")
+            elif budget_message:
+                st.error(budget_message)
             else:
                 with st.spinner("Analyzing documents..."):
-                    # Extract text once
-                    text, filenames = utils.extract_text_from_files(uploaded_files)
+                    # Extract text once into the memory-mapped page store
+                    store, filenames = utils.build_text_store(uploaded_files)
                     
-                    # Validate Document
-                    is_valid = utils.validate_research_paper(text, api_key)
+                    # Validate Document (only the first 2000 characters are needed)
+                    try:
+                        is_valid = utils.validate_research_paper(store.head(2000), api_key, usage=usage)
+                    except BudgetExceeded as e:
+                        is_valid = None
+                        store.close()
+                        st.error(str(e))
                     
-                    if not is_valid:
+                    if is_valid is False:
+                        store.close()
                         st.error("Please upload relevant document. The uploaded file does not appear to be a research paper.")
-                    else:
-                        st.session_state.extracted_text = text
+                    elif is_valid:
+                        if st.session_state.get("text_store") is not None:
+                            st.session_state.text_store.close()
+                        st.session_state.text_store = store
                         
-                        # Run Gap Analysis
-                        if run_gap_analysis:
-                            status_msg = st.empty()
-                            status_msg.info("Generating Research Gap Table...")
-                            df = utils.generate_research_gap_table(text, api_key)
-                            st.session_state.processed_data = df
-                            status_msg.empty()
+                        # Full corpus text for the analysis prompts, decoded once for this run
+                        text = store.text()
+                        
+                        try:
+                            # Run Gap Analysis
+                            if run_gap_analysis:
+                                status_msg = st.empty()
+                                status_msg.info("Generating Research Gap Table...")
+                                df = utils.generate_research_gap_table(text, api_key, usage=usage)
+                                st.session_state.processed_data = df
+                                status_msg.empty()
                             
-                        # Run Literature Review
-                        if run_lit_review:
-                            status_msg = st.empty()
-                            status_msg.info("Generating Literature Review...")
-                            review = utils.generate_literature_review(text, api_key)
-                            st.session_state.literature_review = review
-                            status_msg.empty()
+                            # Run Literature Review
+                            if run_lit_review:
+                                status_msg = st.empty()
+                                status_msg.info("Generating Literature Review...")
+                                review = utils.generate_literature_review(text, api_key, usage=usage)
+                                st.session_state.literature_review = review
+                                status_msg.empty()
                             
-                        st.success("Analysis Complete!")
+                            st.success("Analysis Complete!")
+                        except BudgetExceeded as e:
+                            status_msg.empty()
+                            st.error(str(e))
 
         # Display Results using Tabs
         # Determine which tabs to show
@@ -222,50 +334,6 @@ def main():
         if tab_names:
             st.divider()
             
-            # Modern Navigation Menu Styling
-            st.markdown("""
-            <style>
-                /* Style the tab container */
-                .stTabs [data-baseweb="tab-list"] {
-                    gap: 10px;
-                    background-color: transparent;
-                    border-bottom: none;
-                }
-                
-                /* Style individual tabs */
-                .stTabs [data-baseweb="tab"] {
-                    height: 50px;
-                    white-space: pre-wrap;
-                    background-color: #262730;
-                    border-radius: 10px;
-                    color: #fafafa;
-                    font-weight: 600;
-                    padding: 0 20px;
-                    border: 1px solid #444;
-                    transition: all 0.3s ease;
-                }
-                
-                /* Hover effect */
-                .stTabs [data-baseweb="tab"]:hover {
-                    background-color: #333;
-                    border-color: #666;
-                    color: #ff4b4b;
-                }
-                
-                /* Active tab style */
-                .stTabs [aria-selected="true"] {
-                    background-color: #ff4b4b !important;
-                    color: white !important;
-                    border-color: #ff4b4b !important;
-                }
-                
-                /* Remove default focus outline */
-                .stTabs [data-baseweb="tab"]:focus {
-                    outline: none;
-                }
-            </style>
-            """, unsafe_allow_html=True)
-            
             tabs = st.tabs(tab_names)
             
             # Iterate through tabs and render content based on name
@@ -283,11 +351,13 @@ def main():
                             
                         col1, col2 = st.columns(2)
                         with col1:
-                            pdf_data = utils.create_pdf_download(st.session_state.processed_data)
+                            pdf_data = cached_pdf_download(st.session_state.processed_data)
                             st.download_button("Download PDF", pdf_data, "research_gap.pdf", "application/pdf")
                         with col2:
-                            docx_data = utils.create_docx_download(st.session_state.processed_data)
+                            docx_data = cached_docx_download(st.session_state.processed_data)
                             st.download_button("Download DOCX", docx_data, "research_gap.docx", "application/vnd.openxmlformats-officedocument.wordprocessingprocessingml.document")
+                        
+                        columnar_download(st.session_state.processed_data, "research_gap", "gap_export")
 
                     # --- CONCISE TABLE TAB ---
                     elif tab_name == "📋 Concise Table":
@@ -295,10 +365,13 @@ def main():
                         
                         # Generation Button (if not already generated or to regenerate)
                         if st.button("✨ Generate Concise Table", key="gen_concise"):
-                            with st.spinner("Condensing table..."):
-                                concise_df = utils.generate_concise_table(st.session_state.processed_data, api_key)
+                            try:
+                                with st.spinner("Condensing table..."):
+                                    concise_df = utils.generate_concise_table(st.session_state.processed_data, api_key, usage=usage)
                                 st.session_state.concise_data = concise_df
                                 st.rerun()
+                            except BudgetExceeded as e:
+                                st.error(str(e))
                         
                         if st.session_state.concise_data is not None:
                             sub_tab3, sub_tab4 = st.tabs(["Interactive", "Full Text"])
@@ -309,11 +382,13 @@ def main():
                                 
                             col3, col4 = st.columns(2)
                             with col3:
-                                c_pdf = utils.create_pdf_download(st.session_state.concise_data)
+                                c_pdf = cached_pdf_download(st.session_state.concise_data)
                                 st.download_button("Download Concise PDF", c_pdf, "concise_gap.pdf", "application/pdf")
                             with col4:
-                                c_docx = utils.create_docx_download(st.session_state.concise_data)
+                                c_docx = cached_docx_download(st.session_state.concise_data)
                                 st.download_button("Download Concise DOCX", c_docx, "concise_gap.docx", "application/vnd.openxmlformats-officedocument.wordprocessingml.document")
+                            
+                            columnar_download(st.session_state.concise_data, "concise_gap", "concise_export", "Concise ")
                         else:
                             st.info("Click the button above to generate a concise version of the gap table.")
 
@@ -321,7 +396,7 @@ def main():
                     elif tab_name == "📝 Literature Review":
                         st.subheader("Literature Review")
                         st.markdown(st.session_state.literature_review)
-                        lr_docx = utils.create_review_docx(st.session_state.literature_review)
+                        lr_docx = cached_review_docx(st.session_state.literature_review)
                         st.download_button("Download Review DOCX", lr_docx, "literature_review.docx", "application/vnd.openxmlformats-officedocument.wordprocessingml.document")
 
             # Q&A Section (Always visible if any analysis is done)
@@ -345,13 +420,18 @@ def main():
                     st.markdown(prompt)
 
                 # Generate answer
-                with st.spinner("Thinking..."):
-                    answer = utils.answer_question(st.session_state.extracted_text, prompt, api_key)
-                    
-                # Add assistant response to history
-                st.session_state.chat_history.append(("assistant", answer))
-                with st.chat_message("assistant"):
-                    st.markdown(answer)
+                try:
+                    with st.spinner("Thinking..."):
+                        answer = utils.answer_question(st.session_state.text_store.relevant_text(prompt, 30000), prompt, api_key, usage=usage)
+                except BudgetExceeded as e:
+                    # Drop the unanswered question so the saved history stays in pairs
+                    st.session_state.chat_history.pop()
+                    st.error(str(e))
+                else:
+                    # Add assistant response to history
+                    st.session_state.chat_history.append(("assistant", answer))
+                    with st.chat_message("assistant"):
+                        st.markdown(answer)
             
             # Chat History Management (Sidebar)
             st.sidebar.divider()
@@ -399,5 +479,15 @@ def main():
     elif not uploaded_files:
         st.info("Please upload research papers to begin analysis.")
 
+    # API Usage (Sidebar) - rendered last so it includes this run's requests
+    if usage.tasks:
+        st.sidebar.divider()
+        st.sidebar.header("API Usage")
+        if usage.max_requests:
+            st.sidebar.progress(min(usage.total_requests / usage.max_requests, 1.0), text=f"Requests: {usage.total_requests} / {usage.max_requests}")
+        if usage.max_tokens:
+            st.sidebar.progress(min(usage.total_tokens / usage.max_tokens, 1.0), text=f"Tokens: {usage.total_tokens:,} / {usage.max_tokens:,}")
+        st.sidebar.dataframe(usage.summary(), hide_index=True)
+
 if __name__ == "__main__":
     main()
@@ -0,0 +1,89 @@
+"""
+Startup and rerun timing benchmark for the Streamlit app.
+
+Measures, each in a fresh interpreter:
+  * utils import time, and which heavy dependencies it pulls in eagerly
+  * time-to-first-paint: app.py first script run under Streamlit's AppTest harness
+  * per-rerun script time: subsequent reruns of the same session
+
+Usage:
+    python benchmarks/bench_startup.py [--reruns 20] [--json]
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+HEAVY_MODULES = ['google.generativeai', 'PyPDF2', 'docx', 'pandas', 'reportlab']
+
+_IMPORT_PROBE = """
+import json, sys, time
+start = time.perf_counter()
+import utils
+elapsed = time.perf_counter() - start
+heavy = [m for m in {heavy!r} if m in sys.modules]
+print(json.dumps({{"utils_import_s": elapsed, "eager_heavy_modules": heavy}}))
+"""
+
+_APP_PROBE = """
+import json, time
+from streamlit.testing.v1 import AppTest
+at = AppTest.from_file("app.py", default_timeout=60)
+start = time.perf_counter()
+at.run()
+first_paint = time.perf_counter() - start
+reruns = []
+for _ in range({reruns}):
+    start = time.perf_counter()
+    at.run()
+    reruns.append(time.perf_counter() - start)
+print(json.dumps({{"first_paint_s": first_paint, "rerun_s": reruns}}))
+"""
+
+def _run_probe(code):
+    """
+    Runs a probe script in a fresh interpreter from the repo root and returns its JSON output.
+    """
+    result = subprocess.run(
+        [sys.executable, '-c', code], cwd=REPO_ROOT,
+        capture_output=True, text=True, check=True,
+    )
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+def run_benchmark(reruns=20):
+    """
+    Runs the import and app probes and returns a flat dict of timings in seconds.
+    """
+    results = _run_probe(_IMPORT_PROBE.format(heavy=HEAVY_MODULES))
+    app = _run_probe(_APP_PROBE.format(reruns=reruns))
+    rerun_times = app['rerun_s']
+    results.update({
+        'first_paint_s': app['first_paint_s'],
+        'rerun_median_s': statistics.median(rerun_times) if rerun_times else 0.0,
+        'rerun_max_s': max(rerun_times) if rerun_times else 0.0,
+    })
+    return results
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--reruns', type=int, default=20, help='Number of reruns to time after first paint.')
+    parser.add_argument('--json', action='store_true', help='Print results as JSON.')
+    args = parser.parse_args()
+
+    results = run_benchmark(args.reruns)
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+
+    print(f"utils import:        {results['utils_import_s'] * 1000:8.1f} ms")
+    print(f"eager heavy modules: {', '.join(results['eager_heavy_modules']) or 'none'}")
+    print(f"time to first paint: {results['first_paint_s'] * 1000:8.1f} ms")
+    print(f"rerun (median):      {results['rerun_median_s'] * 1000:8.1f} ms")
+    print(f"rerun (max):         {results['rerun_max_s'] * 1000:8.1f} ms")
+
+if __name__ == '__main__':
+    main()
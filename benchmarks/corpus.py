@@ -0,0 +1,131 @@
+"""
+Synthetic research paper corpora for the benchmark suite.
+
+Papers are generated deterministically from a seed as PDF (ReportLab) and DOCX
+(python-docx) files with the usual sections and a results table, and cached on
+disk so repeated benchmark runs reuse the same corpus.
+"""
+import io
+import os
+import random
+
+CORPUS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '.corpus')
+
+_VOCAB = (
+    "model data learning network analysis method approach system performance accuracy "
+    "dataset training evaluation baseline results framework feature signal detection "
+    "classification regression transformer convolutional sampling optimization robust "
+    "scalable distributed latency throughput benchmark survey clinical sensor image text "
+    "graph temporal spatial adaptive efficient novel proposed experimental significant"
+).split()
+
+_SURNAMES = "Smith Perera Chen Garcia Silva Kumar Müller Rossi Tanaka Okafor Fernando Novak".split()
+
+class SyntheticUpload(io.BytesIO):
+    """
+    In-memory file with a name, mimicking Streamlit's UploadedFile for extract_text_from_files.
+    """
+    def __init__(self, data, name):
+        super().__init__(data)
+        self.name = name
+
+def _sentence(rng, words=14):
+    text = ' '.join(rng.choice(_VOCAB) for _ in range(words))
+    return text.capitalize() + '.'
+
+def _paragraph(rng, sentences=6):
+    return ' '.join(_sentence(rng) for _ in range(sentences))
+
+def generate_paper(index, seed=0):
+    """
+    Returns a dict describing one synthetic paper: title, authors, year, sections and a results table.
+    """
+    rng = random.Random(seed * 1000003 + index)
+    return {
+        'title': ' '.join(rng.choice(_VOCAB) for _ in range(8)).title(),
+        'authors': ', '.join(f"{rng.choice('ABCDEFGHJKLMNPRST')}. {rng.choice(_SURNAMES)}" for _ in range(3)),
+        'year': 2015 + rng.randrange(11),
+        'sections': [
+            ('Abstract', _paragraph(rng, 5)),
+            ('1. Introduction', _paragraph(rng, 8)),
+            ('2. Related Work', _paragraph(rng, 8)),
+            ('3. Methodology', _paragraph(rng, 10)),
+            ('4. Results', _paragraph(rng, 8)),
+            ('5. Conclusion', _paragraph(rng, 5)),
+        ],
+        'table': [['Method', 'Accuracy', 'F1', 'Latency (ms)']] + [
+            [rng.choice(_VOCAB).title(), f"{rng.uniform(0.6, 0.99):.3f}", f"{rng.uniform(0.5, 0.95):.3f}", str(rng.randrange(5, 500))]
+            for _ in range(5)
+        ],
+        'references': [
+            f"[{i + 1}] {rng.choice(_SURNAMES)} et al., \"{_sentence(rng, 6)[:-1]}\", {2000 + rng.randrange(25)}."
+            for i in range(10)
+        ],
+    }
+
+def render_pdf(paper):
+    """
+    Renders a synthetic paper to PDF bytes.
+    """
+    from reportlab.lib.pagesizes import A4
+    from reportlab.lib.styles import getSampleStyleSheet
+    from reportlab.platypus import SimpleDocTemplate, Paragraph, Table
+
+    buffer = io.BytesIO()
+    styles = getSampleStyleSheet()
+    elements = [
+        Paragraph(paper['title'], styles['Title']),
+        Paragraph(f"{paper['authors']} ({paper['year']})", styles['Normal']),
+    ]
+    for heading, body in paper['sections']:
+        elements.append(Paragraph(heading, styles['Heading2']))
+        elements.append(Paragraph(body, styles['Normal']))
+    elements.append(Table(paper['table']))
+    elements.append(Paragraph('References', styles['Heading2']))
+    elements.extend(Paragraph(ref, styles['Normal']) for ref in paper['references'])
+    SimpleDocTemplate(buffer, pagesize=A4).build(elements)
+    return buffer.getvalue()
+
+def render_docx(paper):
+    """
+    Renders a synthetic paper to DOCX bytes.
+    """
+    import docx
+
+    doc = docx.Document()
+    doc.add_heading(paper['title'], 0)
+    doc.add_paragraph(f"{paper['authors']} ({paper['year']})")
+    for heading, body in paper['sections']:
+        doc.add_heading(heading, 1)
+        doc.add_paragraph(body)
+    table = doc.add_table(rows=0, cols=len(paper['table'][0]))
+    for row in paper['table']:
+        cells = table.add_row().cells
+        for i, value in enumerate(row):
+            cells[i].text = value
+    doc.add_heading('References', 1)
+    for ref in paper['references']:
+        doc.add_paragraph(ref)
+    buffer = io.BytesIO()
+    doc.save(buffer)
+    return buffer.getvalue()
+
+def build_corpus(size, fmt, seed=0, cache_dir=CORPUS_DIR):
+    """
+    Returns a list of SyntheticUpload objects for `size` papers in `fmt` ('pdf' or 'docx').
+    Rendered files are cached under cache_dir/<fmt>-<seed>/ and reused across runs.
+    """
+    render = {'pdf': render_pdf, 'docx': render_docx}[fmt]
+    directory = os.path.join(cache_dir, f"{fmt}-{seed}")
+    os.makedirs(directory, exist_ok=True)
+
+    uploads = []
+    for index in range(size):
+        name = f"paper_{index:04d}.{fmt}"
+        path = os.path.join(directory, name)
+        if not os.path.exists(path):
+            with open(path, 'wb') as f:
+                f.write(render(generate_paper(index, seed)))
+        with open(path, 'rb') as f:
+            uploads.append(SyntheticUpload(f.read(), name))
+    return uploads
@@ -0,0 +1,202 @@
+"""
+Reproducible benchmark suite for extraction, table parsing, concise tables, exports
+and the end-to-end analysis flow, run against synthetic corpora with a fake LLM.
+
+Each scenario is timed (best of --repeat runs) and then run once more under
+tracemalloc to record peak Python memory (native allocations, e.g. inside
+PyArrow, are not traced). Results are compared with the stored
+baseline and the run fails if any scenario is slower or uses more memory than
+the baseline by more than --threshold.
+
+Usage:
+    python benchmarks/run_benchmarks.py                      # all sizes, compare to baseline
+    python benchmarks/run_benchmarks.py --sizes 1 10         # quick run
+    python benchmarks/run_benchmarks.py --update-baseline    # record a new baseline
+"""
+import argparse
+import json
+import os
+import platform
+import sys
+import time
+import tracemalloc
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+REPO_ROOT = os.path.dirname(BENCH_DIR)
+sys.path.insert(0, REPO_ROOT)
+sys.path.insert(0, BENCH_DIR)
+
+import utils
+from corpus import build_corpus
+from model_router import UsageTracker
+from fake_llm import FakeLLM, patched_llm
+
+DEFAULT_SIZES = [1, 10, 100, 1000]
+BASELINE_PATH = os.path.join(BENCH_DIR, 'baseline.json')
+
+# Differences below these are treated as noise, whatever the relative change
+MIN_TIME_DELTA_S = 0.05
+MIN_MEMORY_DELTA_MB = 1.0
+
+API_KEY = 'benchmark-key'
+QUESTION = "Which methods report the best accuracy?"
+
+def _rewind(uploads):
+    for upload in uploads:
+        upload.seek(0)
+    return uploads
+
+def _build_store(uploads):
+    store, _ = utils.build_text_store(_rewind(uploads))
+    store.close()
+
+def _end_to_end(uploads):
+    usage = UsageTracker(max_requests=0, max_tokens=0)
+    store, _ = utils.build_text_store(_rewind(uploads))
+    if not utils.validate_research_paper(store.head(2000), API_KEY, usage=usage):
+        raise RuntimeError("Fake LLM rejected the synthetic corpus.")
+    text = store.text()
+    df = utils.generate_research_gap_table(text, API_KEY, usage=usage)
+    concise = utils.generate_concise_table(df, API_KEY, usage=usage)
+    review = utils.generate_literature_review(text, API_KEY, usage=usage)
+    utils.create_pdf_download(df)
+    utils.create_docx_download(concise)
+    utils.create_review_docx(review)
+    utils.answer_question(store.relevant_text(QUESTION, 30000), QUESTION, API_KEY, usage=usage)
+    store.close()
+
+def build_scenarios(size, seed=0):
+    """
+    Returns (name, callable) pairs for one corpus size. Inputs are prepared up front
+    so only the operation under test is timed.
+    """
+    pdfs = build_corpus(size, 'pdf', seed)
+    docxs = build_corpus(size, 'docx', seed)
+    mixed = pdfs[:(size + 1) // 2] + docxs[:size // 2]
+
+    fake = FakeLLM(rows=size)
+    with patched_llm(utils, fake):
+        text, _ = utils.extract_text_from_files(_rewind(mixed))
+        df = utils.generate_research_gap_table(text, API_KEY)
+
+    return [
+        ('extract_pdf', lambda: utils.extract_text_from_files(_rewind(pdfs))),
+        ('extract_docx', lambda: utils.extract_text_from_files(_rewind(docxs))),
+        ('build_text_store', lambda: _build_store(mixed)),
+        ('parse_gap_table', lambda: utils.generate_research_gap_table(text, API_KEY)),
+        ('concise_table', lambda: utils.generate_concise_table(df, API_KEY)),
+        ('export_pdf', lambda: utils.create_pdf_download(df)),
+        ('export_docx', lambda: utils.create_docx_download(df)),
+        ('export_csv', lambda: utils.create_csv_download(df)),
+        ('export_xlsx', lambda: utils.create_xlsx_download(df)),
+        ('export_parquet', lambda: utils.create_parquet_download(df)),
+        ('end_to_end', lambda: _end_to_end(mixed)),
+    ], fake
+
+def measure(func, repeat):
+    """
+    Returns (best wall time in seconds, peak traced memory in MB) for func.
+    """
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+
+    tracemalloc.start()
+    try:
+        func()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return best, peak / (1024 * 1024)
+
+def run_suite(sizes, repeat=5, seed=0, only=None):
+    """
+    Runs all scenarios for each size and returns results keyed by "<scenario>@<size>".
+    """
+    results = {}
+    for size in sizes:
+        scenarios, fake = build_scenarios(size, seed)
+        with patched_llm(utils, fake):
+            for name, func in scenarios:
+                if only and name not in only:
+                    continue
+                seconds, peak_mb = measure(func, repeat)
+                results[f"{name}@{size}"] = {
+                    'time_s': round(seconds, 6),
+                    'papers_per_s': round(size / seconds, 3) if seconds else None,
+                    'peak_mb': round(peak_mb, 3),
+                }
+                print(f"{name:>16} @ {size:<5} {seconds * 1000:10.1f} ms  "
+                      f"{size / seconds if seconds else 0:10.1f} papers/s  {peak_mb:8.2f} MB peak", flush=True)
+    return results
+
+def compare(results, baseline, threshold):
+    """
+    Returns a list of human-readable regressions of results against baseline.
+    """
+    regressions = []
+    for key, current in sorted(results.items()):
+        reference = baseline.get(key)
+        if reference is None:
+            continue
+        for metric, floor, unit in (('time_s', MIN_TIME_DELTA_S, 's'), ('peak_mb', MIN_MEMORY_DELTA_MB, 'MB')):
+            old, new = reference[metric], current[metric]
+            if new > old * (1 + threshold) and new - old > floor:
+                regressions.append(f"{key} {metric}: {old:.4f}{unit} -> {new:.4f}{unit} (+{(new / old - 1) * 100:.0f}%)")
+    return regressions
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark suite with synthetic paper corpora.")
+    parser.add_argument('--sizes', type=int, nargs='+', default=DEFAULT_SIZES, help='Corpus sizes (number of papers).')
+    parser.add_argument('--repeat', type=int, default=5, help='Timed runs per scenario; the best is kept.')
+    parser.add_argument('--seed', type=int, default=0, help='Seed for the synthetic corpus.')
+    parser.add_argument('--only', nargs='+', help='Run only these scenarios.')
+    parser.add_argument('--threshold', type=float, default=0.25, help='Allowed relative regression (0.25 = 25%%).')
+    parser.add_argument('--baseline', default=BASELINE_PATH, help='Baseline JSON file.')
+    parser.add_argument('--update-baseline', action='store_true', help='Write results to the baseline instead of comparing.')
+    parser.add_argument('--output', help='Also write results to this JSON file.')
+    args = parser.parse_args()
+
+    results = run_suite(args.sizes, args.repeat, args.seed, args.only)
+    report = {
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'results': results,
+    }
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+
+    if args.update_baseline:
+        baseline = {}
+        if os.path.exists(args.baseline):
+            with open(args.baseline) as f:
+                baseline = json.load(f).get('results', {})
+        baseline.update(results)
+        report['results'] = dict(sorted(baseline.items()))
+        with open(args.baseline, 'w') as f:
+            json.dump(report, f, indent=2)
+            f.write('\n')
+        print(f"Baseline written to {args.baseline}")
+        return 0
+
+    if not os.path.exists(args.baseline):
+        print(f"No baseline at {args.baseline}; run with --update-baseline to create one.")
+        return 0
+
+    with open(args.baseline) as f:
+        baseline = json.load(f)['results']
+    regressions = compare(results, baseline, args.threshold)
+    if regressions:
+        print(f"\n{len(regressions)} regression(s) beyond {args.threshold * 100:.0f}%:")
+        for line in regressions:
+            print(f"  {line}")
+        return 1
+    print(f"\nNo regressions beyond {args.threshold * 100:.0f}% against baseline.")
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,120 @@
+"""
+Per-task Gemini model routing and per-session usage accounting.
+
+Each LLM call is tagged with a task type. model_for_task() picks a lightweight
+model for cheap tasks (validation, Q&A) and the full model for tables and
+reviews; every choice can be overridden with GEMINI_MODEL_<TASK> environment
+variables. UsageTracker records requests, tokens and latency per task for one
+Streamlit session; get_gemini_response raises BudgetExceeded once it is spent.
+"""
+import os
+
+DEFAULT_MODEL = 'gemini-2.5-flash'
+LIGHT_MODEL = 'gemini-2.5-flash-lite'
+
+TASK_MODELS = {
+    'validation': LIGHT_MODEL,
+    'qa': LIGHT_MODEL,
+    'gap_table': DEFAULT_MODEL,
+    'concise_table': DEFAULT_MODEL,
+    'literature_review': DEFAULT_MODEL,
+}
+
+# Per-session budgets; 0 disables a limit
+DEFAULT_MAX_REQUESTS = 200
+DEFAULT_MAX_TOKENS = 4000000
+
+# Rough characters-per-token ratio used to estimate a prompt's size before sending it
+CHARS_PER_TOKEN = 4
+
+class BudgetExceeded(Exception):
+    """
+    Raised when a request would exceed the session's request or token budget.
+    """
+
+def model_for_task(task):
+    """
+    Returns the Gemini model name for a task type.
+    Precedence: GEMINI_MODEL_<TASK> env var, TASK_MODELS, GEMINI_MODEL env var, DEFAULT_MODEL.
+    """
+    env_model = os.environ.get(f"GEMINI_MODEL_{task.upper()}")
+    if env_model:
+        return env_model
+    if task in TASK_MODELS:
+        return TASK_MODELS[task]
+    return os.environ.get('GEMINI_MODEL', DEFAULT_MODEL)
+
+def estimate_tokens(*texts):
+    """
+    Estimates the token count of the given texts from their length.
+    """
+    return sum(len(text) for text in texts if text) // CHARS_PER_TOKEN
+
+def _env_int(name, default):
+    value = os.environ.get(name)
+    try:
+        return int(value) if value else default
+    except ValueError:
+        print(f"Ignoring invalid {name}={value!r}")
+        return default
+
+class UsageTracker:
+    """
+    Per-session record of Gemini requests, token usage and latency, grouped by task.
+    Budgets default to the GEMINI_SESSION_MAX_REQUESTS / GEMINI_SESSION_MAX_TOKENS env vars.
+    """
+    def __init__(self, max_requests=None, max_tokens=None):
+        self.max_requests = _env_int('GEMINI_SESSION_MAX_REQUESTS', DEFAULT_MAX_REQUESTS) if max_requests is None else max_requests
+        self.max_tokens = _env_int('GEMINI_SESSION_MAX_TOKENS', DEFAULT_MAX_TOKENS) if max_tokens is None else max_tokens
+        self.tasks = {}
+
+    @property
+    def total_requests(self):
+        return sum(stats['requests'] for stats in self.tasks.values())
+
+    @property
+    def total_tokens(self):
+        return sum(stats['prompt_tokens'] + stats['output_tokens'] for stats in self.tasks.values())
+
+    def check(self, estimated_tokens=0):
+        """
+        Returns a message explaining why a new request would exceed the session budget, or None if it is allowed.
+        """
+        if self.max_requests and self.total_requests >= self.max_requests:
+            return f"Session request budget exhausted ({self.max_requests} requests)."
+        if self.max_tokens and self.total_tokens + estimated_tokens > self.max_tokens:
+            return (f"Session token budget exceeded: {self.total_tokens:,} of {self.max_tokens:,} tokens used, "
+                    f"this request needs about {estimated_tokens:,} more.")
+        return None
+
+    def record(self, task, model, latency_s, prompt_tokens=0, output_tokens=0, error=False):
+        """
+        Records one completed (or failed) request for a task.
+        """
+        stats = self.tasks.setdefault(task, {
+            'model': model, 'requests': 0, 'errors': 0,
+            'prompt_tokens': 0, 'output_tokens': 0, 'latency_s': 0.0,
+        })
+        stats['model'] = model
+        stats['requests'] += 1
+        stats['errors'] += int(error)
+        stats['prompt_tokens'] += prompt_tokens
+        stats['output_tokens'] += output_tokens
+        stats['latency_s'] += latency_s
+
+    def summary(self):
+        """
+        Returns one row per task with request counts, token usage and latency, for display.
+        """
+        return [
+            {
+                'Task': task,
+                'Model': stats['model'],
+                'Requests': stats['requests'],
+                'Errors': stats['errors'],
+                'Prompt Tokens': stats['prompt_tokens'],
+                'Output Tokens': stats['output_tokens'],
+                'Avg Latency (s)': round(stats['latency_s'] / stats['requests'], 2),
+            }
+            for task, stats in sorted(self.tasks.items())
+        ]
@@ -0,0 +1,92 @@
+import io
+import zipfile
+
+import utils
+
+W = 'xmlns:w="http://schemas.openxmlformats.org/wordprocessingml/2006/main"'
+MC = 'xmlns:mc="http://schemas.openxmlformats.org/markup-compatibility/2006"'
+
+def _docx(body):
+    xml = f'<?xml version="1.0"?><w:document {W} {MC}><w:body>{body}</w:body></w:document>'
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, 'w') as archive:
+        archive.writestr('word/document.xml', xml)
+    buffer.seek(0)
+    return buffer
+
+def _p(text):
+    return f'<w:p><w:r><w:t xml:space="preserve">{text}</w:t></w:r></w:p>'
+
+def _tc(content):
+    return f'<w:tc>{content}</w:tc>'
+
+def test_paragraphs_tabs_and_breaks():
+    body = '<w:p><w:r><w:t>Hello</w:t><w:tab/><w:t>world</w:t><w:br/><w:t>again</w:t></w:r></w:p>' + _p('Second')
+    assert list(utils.iter_docx_text(_docx(body))) == ['Hello\tworld\nagain', 'Second']
+
+def test_tables_yield_rows_and_flatten_nested_tables():
+    nested = f'<w:tbl><w:tr>{_tc(_p("inner"))}</w:tr></w:tbl>'
+    body = (
+        _p('Before')
+        + '<w:tbl>'
+        + f'<w:tr>{_tc(_p("A") + _p("A2"))}{_tc(nested)}</w:tr>'
+        + f'<w:tr>{_tc(_p("0.93"))}{_tc("<w:p/>")}</w:tr>'
+        + '</w:tbl>'
+        + _p('After')
+    )
+    assert list(utils.iter_docx_text(_docx(body))) == ['Before', 'A A2 | inner', '0.93 | ', 'After']
+
+def test_text_box_is_folded_into_outer_paragraph_once():
+    text_box = (
+        '<w:r><mc:AlternateContent>'
+        f'<mc:Choice Requires="wps"><w:drawing><w:txbxContent>{_p("BOX")}</w:txbxContent></w:drawing></mc:Choice>'
+        f'<mc:Fallback><w:pict><w:txbxContent>{_p("BOX")}</w:txbxContent></w:pict></mc:Fallback>'
+        '</mc:AlternateContent></w:r>'
+    )
+    body = (
+        '<w:p><w:r><w:t xml:space="preserve">Outer start </w:t></w:r>'
+        + text_box
+        + '<w:r><w:t xml:space="preserve"> outer end</w:t></w:r></w:p>'
+        + _p('Next')
+    )
+    assert list(utils.iter_docx_text(_docx(body))) == ['Outer start BOX outer end', 'Next']
+
+def _fake_converter(tmp_path, name, script):
+    path = tmp_path / name
+    path.write_text('#!/bin/sh\n' + script)
+    path.chmod(0o755)
+    return str(path)
+
+def test_doc_falls_back_to_antiword_when_libreoffice_writes_nothing(tmp_path, monkeypatch):
+    converters = {
+        'soffice': _fake_converter(tmp_path, 'soffice', 'exit 0\n'),
+        'antiword': _fake_converter(tmp_path, 'antiword', 'printf "Legacy line 1\\nLegacy line 2\\n"\n'),
+    }
+    monkeypatch.setattr(utils.shutil, 'which', converters.get)
+    assert list(utils.iter_doc_text(io.BytesIO(b'doc'))) == ['Legacy line 1', 'Legacy line 2']
+
+def test_doc_falls_back_to_antiword_when_libreoffice_fails(tmp_path, monkeypatch):
+    converters = {
+        'soffice': _fake_converter(tmp_path, 'soffice', 'exit 1\n'),
+        'antiword': _fake_converter(tmp_path, 'antiword', 'echo "Recovered"\n'),
+    }
+    monkeypatch.setattr(utils.shutil, 'which', converters.get)
+    assert list(utils.iter_doc_text(io.BytesIO(b'doc'))) == ['Recovered']
+
+def test_doc_uses_private_libreoffice_profile(tmp_path, monkeypatch):
+    # Writes the converted DOCX only if a per-conversion profile is passed
+    script = (
+        'case "$1" in -env:UserInstallation=file://*/lo_profile) ;; *) exit 1 ;; esac\n'
+        f'cp "{tmp_path}/converted.docx" "$6/input.docx"\n'
+    )
+    (tmp_path / 'converted.docx').write_bytes(_docx(_p('Converted')).getvalue())
+    converters = {'soffice': _fake_converter(tmp_path, 'soffice', script)}
+    monkeypatch.setattr(utils.shutil, 'which', converters.get)
+    assert list(utils.iter_doc_text(io.BytesIO(b'doc'))) == ['Converted']
+
+def test_tab_stop_definitions_are_not_text():
+    body = (
+        '<w:p><w:pPr><w:tabs><w:tab w:val="left" w:pos="2000"/><w:tab w:val="right" w:pos="9000"/></w:tabs></w:pPr>'
+        '<w:r><w:t>Name</w:t><w:tab/><w:t>Value</w:t></w:r></w:p>'
+    )
+    assert list(utils.iter_docx_text(_docx(body))) == ['Name\tValue']
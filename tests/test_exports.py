@@ -0,0 +1,89 @@
+import io
+
+import pandas as pd
+import pyarrow.parquet as pq
+import pytest
+
+import utils
+
+openpyxl = pytest.importorskip('openpyxl')
+
+def _read_xlsx(buffer):
+    sheet = openpyxl.load_workbook(buffer).active
+    return [[cell if cell is not None else '' for cell in row] for row in sheet.iter_rows(values_only=True)]
+
+@pytest.fixture
+def df_with_missing():
+    return pd.DataFrame({'A': ['x', None], 'B': [None, 2.5]})
+
+def test_csv_writes_missing_values_as_empty(df_with_missing):
+    assert utils.create_csv_download(df_with_missing).getvalue() == b'A,B\nx,\n,2.5\n'
+
+def test_parquet_writes_missing_values_as_empty(df_with_missing):
+    table = pq.read_table(utils.create_parquet_download(df_with_missing))
+    assert table.to_pydict() == {'A': ['x', ''], 'B': ['', '2.5']}
+
+def test_xlsx_writes_missing_values_as_empty(df_with_missing):
+    assert _read_xlsx(utils.create_xlsx_download(df_with_missing)) == [['A', 'B'], ['x', ''], ['', '2.5']]
+
+def test_concatenated_tables_with_different_columns_export():
+    combined = pd.concat([pd.DataFrame({'A': ['1']}), pd.DataFrame({'B': ['2']})], ignore_index=True)
+    assert _read_xlsx(utils.create_xlsx_download(combined)) == [['A', 'B'], ['1', ''], ['', '2']]
+
+def test_csv_append_aligns_to_existing_header(tmp_path):
+    path = str(tmp_path / 'gaps.csv')
+    utils.write_csv_export(pd.DataFrame({'A': ['1'], 'B': ['2']}), path, append=True)
+    utils.write_csv_export(pd.DataFrame({'B': ['4']}), path, append=True)
+    assert pd.read_csv(path, dtype=str, keep_default_na=False).to_dict('list') == {'A': ['1', ''], 'B': ['2', '4']}
+
+def test_csv_append_rejects_unknown_columns(tmp_path):
+    path = str(tmp_path / 'gaps.csv')
+    utils.write_csv_export(pd.DataFrame({'A': ['1']}), path, append=True)
+    with pytest.raises(ValueError):
+        utils.write_csv_export(pd.DataFrame({'A': ['2'], 'C': ['3']}), path, append=True)
+    assert open(path).read() == 'A\n1\n'
+
+    utils.write_csv_export(pd.DataFrame({'A': ['2'], 'C': ['3']}), path, append=True, drop_extra=True)
+    assert open(path).read() == 'A\n1\n2\n'
+
+def test_chunks_from_multiple_frames_reject_unknown_columns():
+    frames = [pd.DataFrame({'A': ['1']}), pd.DataFrame({'A': ['2'], 'C': ['3']})]
+    with pytest.raises(ValueError):
+        utils.write_parquet_export(iter(frames), io.BytesIO())
+
+def test_non_string_column_labels():
+    df = pd.DataFrame({0: ['a'], 1: ['b']})
+    assert pq.read_table(utils.create_parquet_download(df)).to_pydict() == {'0': ['a'], '1': ['b']}
+    assert utils.create_csv_download(df).getvalue() == b'0,1\na,b\n'
+    assert _read_xlsx(utils.create_xlsx_download(df)) == [['0', '1'], ['a', 'b']]
+
+def test_parquet_append_writes_part_files(tmp_path):
+    import pyarrow.dataset as ds
+
+    utils.append_parquet_export(pd.DataFrame({'A': ['1']}), str(tmp_path))
+    utils.append_parquet_export(pd.DataFrame({'A': ['2']}), str(tmp_path))
+    assert sorted(ds.dataset(str(tmp_path)).to_table().column('A').to_pylist()) == ['1', '2']
+
+def test_parquet_append_aligns_to_existing_dataset(tmp_path):
+    import pyarrow.dataset as ds
+
+    utils.append_parquet_export(pd.DataFrame({'a': ['1'], 'b': ['x']}), str(tmp_path))
+    utils.append_parquet_export(pd.DataFrame({'a': ['2']}), str(tmp_path))
+    with pytest.raises(ValueError):
+        utils.append_parquet_export(pd.DataFrame({'a': ['3'], 'c': ['lost']}), str(tmp_path))
+    assert len(list(tmp_path.iterdir())) == 2
+
+    utils.append_parquet_export(pd.DataFrame({'a': ['3'], 'c': ['dropped']}), str(tmp_path), drop_extra=True)
+    rows = ds.dataset(str(tmp_path)).to_table().to_pylist()
+    assert sorted(rows, key=lambda r: r['a']) == [{'a': '1', 'b': 'x'}, {'a': '2', 'b': ''}, {'a': '3', 'b': ''}]
+
+def test_xlsx_writes_formulas_and_urls_as_plain_text():
+    import zipfile
+
+    df = pd.DataFrame({'A': ['=SUM(A1:A2) improved', 'https://example.org/paper']})
+    buffer = utils.create_xlsx_download(df)
+    with zipfile.ZipFile(buffer) as archive:
+        sheet = archive.read('xl/worksheets/sheet1.xml').decode()
+    assert '<f>' not in sheet and '<hyperlink' not in sheet
+    buffer.seek(0)
+    assert _read_xlsx(buffer) == [['A'], ['=SUM(A1:A2) improved'], ['https://example.org/paper']]
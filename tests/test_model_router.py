@@ -0,0 +1,68 @@
+import sys
+import types
+
+import pytest
+
+import model_router
+import utils
+from model_router import BudgetExceeded, UsageTracker
+
+@pytest.fixture
+def fake_genai(monkeypatch):
+    """
+    Installs a stand-in google.generativeai that answers YES and reports token usage.
+    """
+    requested_models = []
+
+    class Response:
+        text = "YES"
+        usage_metadata = types.SimpleNamespace(prompt_token_count=100, candidates_token_count=2)
+
+    class GenerativeModel:
+        def __init__(self, name):
+            requested_models.append(name)
+
+        def generate_content(self, parts):
+            return Response()
+
+    genai = types.ModuleType('google.generativeai')
+    genai.configure = lambda **kwargs: None
+    genai.GenerativeModel = GenerativeModel
+    google = types.ModuleType('google')
+    google.generativeai = genai
+    monkeypatch.setitem(sys.modules, 'google', google)
+    monkeypatch.setitem(sys.modules, 'google.generativeai', genai)
+    return requested_models
+
+def test_tasks_are_routed_and_recorded(fake_genai, monkeypatch):
+    monkeypatch.setenv('GEMINI_MODEL_GAP_TABLE', 'gemini-2.5-pro')
+    usage = UsageTracker(max_requests=0, max_tokens=0)
+
+    assert utils.validate_research_paper("Abstract ...", "key", usage=usage)
+    utils.generate_research_gap_table("text", "key", usage=usage)
+
+    assert fake_genai == [model_router.LIGHT_MODEL, 'gemini-2.5-pro']
+    assert usage.total_requests == 2
+    assert usage.total_tokens == 204
+    assert [row['Task'] for row in usage.summary()] == ['gap_table', 'validation']
+
+@pytest.mark.parametrize('call', [
+    lambda usage: utils.validate_research_paper("text", "key", usage=usage),
+    lambda usage: utils.generate_research_gap_table("text", "key", usage=usage),
+    lambda usage: utils.generate_literature_review("text", "key", usage=usage),
+    lambda usage: utils.answer_question("context", "question", "key", usage=usage),
+])
+def test_exhausted_request_budget_raises(fake_genai, call):
+    usage = UsageTracker(max_requests=1, max_tokens=0)
+    utils.answer_question("context", "question", "key", usage=usage)
+
+    with pytest.raises(BudgetExceeded) as excinfo:
+        call(usage)
+    assert "new session" not in str(excinfo.value)
+    assert usage.total_requests == 1
+
+def test_token_budget_is_checked_before_sending(fake_genai):
+    usage = UsageTracker(max_requests=0, max_tokens=50)
+    with pytest.raises(BudgetExceeded):
+        utils.generate_literature_review("x" * 1000, "key", usage=usage)
+    assert fake_genai == []
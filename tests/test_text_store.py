@@ -0,0 +1,97 @@
+import io
+import zipfile
+
+import pytest
+
+import utils
+from text_store import TextStore
+
+W = 'xmlns:w="http://schemas.openxmlformats.org/wordprocessingml/2006/main"'
+
+class NamedBytesIO(io.BytesIO):
+    def __init__(self, data, name):
+        super().__init__(data)
+        self.name = name
+
+def _docx_upload(paragraphs, name='paper.docx'):
+    body = ''.join(f'<w:p><w:r><w:t xml:space="preserve">{p}</w:t></w:r></w:p>' for p in paragraphs)
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, 'w') as archive:
+        archive.writestr('word/document.xml', f'<?xml version="1.0"?><w:document {W}><w:body>{body}</w:body></w:document>')
+    return NamedBytesIO(buffer.getvalue(), name)
+
+def _long_paper():
+    filler = 'The proposed model improves baseline accuracy on the benchmark dataset. ' * 6
+    paragraphs = [f'Paragraph {i}. {filler}' for i in range(150)]
+    paragraphs[120] = 'The ablation shows the zebrafish imaging pipeline is the main source of error.'
+    return paragraphs
+
+def test_pseudo_pages_split_at_paragraph_boundaries():
+    pages = list(utils._iter_pseudo_pages(['a' * 10, 'b' * 10, 'c' * 10], page_chars=25))
+    assert pages == ['a' * 10 + '\n' + 'b' * 10, 'c' * 10]
+
+def test_pseudo_pages_split_oversized_paragraphs_at_whitespace():
+    pages = list(utils._iter_pseudo_pages(['word ' * 20], page_chars=22))
+    assert all(len(page) <= 22 for page in pages)
+    assert ' '.join(pages).split() == ['word'] * 20
+
+def test_docx_is_stored_as_bounded_pages():
+    store, names = utils.build_text_store([_docx_upload(_long_paper())])
+    assert names == ['paper.docx']
+    assert store.num_pages(0) > 10
+    assert all(len(store.page_view(0, i)) <= utils.PSEUDO_PAGE_CHARS + 1 for i in range(store.num_pages(0)))
+
+    text, _ = utils.extract_text_from_files([_docx_upload(_long_paper())])
+    assert store.text() == text
+    store.close()
+
+def test_relevant_text_finds_pages_deep_in_a_long_docx():
+    store, _ = utils.build_text_store([_docx_upload(_long_paper())])
+    assert store.nbytes > 60000
+    context = store.relevant_text('What about zebrafish imaging?', 30000)
+    assert 'zebrafish imaging pipeline' in context
+    assert len(context) <= 30000
+    store.close()
+
+def test_views_and_head():
+    store = TextStore()
+    store.add_paper('a', ['page one', 'page two'])
+    store.add_paper('b', ['ünïcode'])
+    store.finalize()
+    assert len(store) == 2 and store.num_pages() == 3
+    assert bytes(store.page_view(0, 1)) == b'page two\n'
+    assert store.text(store.paper_view(1)) == 'ünïcode\n'
+    assert store.head(4) == 'page'
+    store.close()
+
+def _store(pages):
+    store = TextStore()
+    store.add_paper('paper', pages)
+    return store.finalize()
+
+def test_relevant_text_ignores_stopwords_and_partial_words():
+    filler = 'The method of the other authors and their theory. ' * 20
+    store = _store([filler, 'Dropout reduces overfitting in small models.', filler])
+    context = store.relevant_text('What is the effect of dropout on the models?', 60)
+    assert context.startswith('Dropout reduces overfitting')
+    store.close()
+
+def test_relevant_text_prefers_rare_terms():
+    common = 'Accuracy accuracy accuracy of the model. '
+    store = _store([common * 5, common + 'Calibration error is reported.', common * 5])
+    context = store.relevant_text('accuracy and calibration', len(common) + 40)
+    assert 'Calibration error' in context
+    store.close()
+
+def test_relevant_text_matches_non_ascii_case_insensitively():
+    store = _store(['Nothing here.', 'ÜBER die Methode der Analyse.'])
+    assert store.relevant_text('über', 100).startswith('ÜBER')
+    store.close()
+
+def test_close_releases_file_even_with_live_views():
+    store = _store(['page'])
+    view = store.page_view(0, 0)
+    with pytest.raises(BufferError):
+        store.close()
+    assert store._file.closed
+    view.release()
@@ -0,0 +1,207 @@
+"""
+Page-level document store backed by a memory-mapped file.
+
+Extracted text is written once, as UTF-8, to an anonymous temporary file and
+indexed by page and paper offsets. Callers take zero-copy memoryview slices of
+individual pages, papers or the whole corpus, and decode only what they need.
+"""
+import math
+import mmap
+import re
+import tempfile
+from array import array
+
+_WORD_RE = re.compile(r'\w+')
+
+# Common English words ignored when matching questions against pages
+_STOPWORDS = frozenset('''
+a about above after again all also an and any are as at be because been before being
+between both but by can could did do does doing during each few for from further had has
+have having how if in into is it its itself just may might more most much must no nor not
+of off on once only or other our out over own paper papers same should so some such than
+that the their them then there these they this those through to too under until up upon
+very was we were what when where which while who whom why will with within would you your
+'''.split())
+
+# BM25 parameters for page ranking
+_BM25_K1 = 1.2
+_BM25_B = 0.75
+
+class TextStore:
+    """
+    Append-only store of per-paper, per-page text.
+    Add papers with add_paper(), call finalize(), then read with the view/text methods.
+    """
+    def __init__(self):
+        self._file = tempfile.TemporaryFile()
+        self._buffer = None
+        # Byte offset where each page starts; the last entry is the end of the data
+        self._page_offsets = array('Q', [0])
+        # Index of the first page of each paper; the last entry is the total page count
+        self._paper_pages = array('Q', [0])
+        self.names = []
+
+    def add_paper(self, name, pages):
+        """
+        Appends a paper from an iterable of page strings. Each page is stored with a trailing newline.
+        If the iterable raises, pages read so far are kept and the exception is re-raised.
+        """
+        if self._buffer is not None:
+            raise RuntimeError("TextStore is finalized; no more papers can be added.")
+        try:
+            for page in pages:
+                data = (page + "\n").encode('utf-8')
+                self._file.write(data)
+                self._page_offsets.append(self._page_offsets[-1] + len(data))
+        finally:
+            self._paper_pages.append(len(self._page_offsets) - 1)
+            self.names.append(name)
+
+    def finalize(self):
+        """
+        Memory-maps the written text for reading. Returns the store for chaining.
+        """
+        if self._buffer is None:
+            self._file.flush()
+            if self._page_offsets[-1]:
+                self._buffer = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+            else:
+                self._buffer = b''
+        return self
+
+    def close(self):
+        """
+        Releases the memory map and the backing file. Callers must release any
+        page/paper/corpus views first; otherwise BufferError is raised, though the
+        backing file is still closed.
+        """
+        buffer, self._buffer = self._buffer, None
+        try:
+            if isinstance(buffer, mmap.mmap):
+                buffer.close()
+        finally:
+            self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def __len__(self):
+        return len(self.names)
+
+    @property
+    def nbytes(self):
+        return self._page_offsets[-1]
+
+    def num_pages(self, paper=None):
+        """
+        Returns the number of pages of one paper, or of the whole corpus if paper is None.
+        """
+        if paper is None:
+            return len(self._page_offsets) - 1
+        return self._paper_pages[paper + 1] - self._paper_pages[paper]
+
+    def _view(self, start, end):
+        if self._buffer is None:
+            raise RuntimeError("TextStore must be finalized before reading.")
+        return memoryview(self._buffer)[start:end]
+
+    def page_view(self, paper, page):
+        """
+        Returns a zero-copy view of the UTF-8 bytes of one page of a paper.
+        """
+        if not 0 <= page < self.num_pages(paper):
+            raise IndexError(f"Page {page} out of range for paper {paper}.")
+        index = self._paper_pages[paper] + page
+        return self._view(self._page_offsets[index], self._page_offsets[index + 1])
+
+    def paper_view(self, paper):
+        """
+        Returns a zero-copy view of the UTF-8 bytes of all pages of a paper.
+        """
+        first, last = self._paper_pages[paper], self._paper_pages[paper + 1]
+        return self._view(self._page_offsets[first], self._page_offsets[last])
+
+    def corpus_view(self):
+        """
+        Returns a zero-copy view of the whole corpus.
+        """
+        return self._view(0, self._page_offsets[-1])
+
+    def text(self, view=None):
+        """
+        Decodes a view (the whole corpus by default) to a string.
+        """
+        if view is None:
+            view = self.corpus_view()
+        return str(view, 'utf-8')
+
+    def head(self, num_chars):
+        """
+        Returns the first num_chars characters of the corpus, decoding only the bytes needed.
+        """
+        # UTF-8 uses at most 4 bytes per character; a character cut at the end is dropped
+        view = self._view(0, min(self.nbytes, num_chars * 4))
+        return str(view, 'utf-8', 'ignore')[:num_chars]
+
+    def relevant_text(self, query, max_chars):
+        """
+        Returns up to max_chars of the pages that best match the query, in document order.
+        Pages are ranked with BM25 over whole, case-folded words, ignoring stopwords,
+        so rare query terms count for more than common ones.
+        Falls back to the start of the corpus if nothing matches.
+        """
+        terms = {t for t in _WORD_RE.findall(query.casefold()) if t not in _STOPWORDS}
+        num_pages = self.num_pages()
+        if not terms or not num_pages:
+            return self.head(max_chars)
+
+        # One pass over the pages: query-term counts and length (in words) of each page
+        page_counts = []
+        page_lengths = []
+        doc_freq = dict.fromkeys(terms, 0)
+        for index in range(num_pages):
+            words = _WORD_RE.findall(self.text(self._page_view_at(index)).casefold())
+            counts = {}
+            for word in words:
+                if word in terms:
+                    counts[word] = counts.get(word, 0) + 1
+            for term in counts:
+                doc_freq[term] += 1
+            page_counts.append(counts)
+            page_lengths.append(len(words))
+
+        avg_length = sum(page_lengths) / num_pages or 1
+        idf = {t: math.log(1 + (num_pages - df + 0.5) / (df + 0.5)) for t, df in doc_freq.items()}
+        scored = []
+        for index, counts in enumerate(page_counts):
+            if not counts:
+                continue
+            norm = _BM25_K1 * (1 - _BM25_B + _BM25_B * page_lengths[index] / avg_length)
+            score = sum(idf[t] * tf * (_BM25_K1 + 1) / (tf + norm) for t, tf in counts.items())
+            scored.append((score, index))
+        if not scored:
+            return self.head(max_chars)
+
+        # Byte budget approximates the character budget; the final slice enforces it exactly
+        budget = max_chars
+        selected = []
+        ranked = sorted(scored, key=lambda item: (-item[0], item[1]))
+        for score, index in ranked:
+            size = self._page_offsets[index + 1] - self._page_offsets[index]
+            if size > budget:
+                continue
+            selected.append(index)
+            budget -= size
+        if not selected:
+            # Every matching page is larger than the budget: take the start of the best one
+            page = self._page_view_at(ranked[0][1])
+            return str(page[:max_chars * 4], 'utf-8', 'ignore')[:max_chars]
+
+        parts = [self.text(self._page_view_at(i)) for i in sorted(selected)]
+        return ''.join(parts)[:max_chars]
+
+    def _page_view_at(self, index):
+        return self._view(self._page_offsets[index], self._page_offsets[index + 1])
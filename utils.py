@@ -1,55 +1,307 @@
-import google.generativeai as genai
-import PyPDF2
-import docx
-import pandas as pd
+# Heavy dependencies (google.generativeai, PyPDF2, python-docx, pandas, ReportLab)
+# are imported inside the functions that need them. Streamlit re-executes app.py on
+# every interaction, so keeping this module cheap to import speeds up cold start.
 import io
-from reportlab.lib import colors
-from reportlab.lib.pagesizes import letter
-from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer
-from reportlab.lib.styles import getSampleStyleSheet
+import os
+import pathlib
+import re
+import shutil
+import subprocess
+import tempfile
+import time
+import zipfile
+import xml.etree.ElementTree as ET
+
+from model_router import BudgetExceeded, model_for_task, estimate_tokens
+
+# WordprocessingML tags used by the streaming DOCX extractor
+_W_NS = '{http://schemas.openxmlformats.org/wordprocessingml/2006/main}'
+_W_BODY = _W_NS + 'body'
+_W_P = _W_NS + 'p'
+_W_T = _W_NS + 't'
+_W_TAB = _W_NS + 'tab'
+_W_BR = _W_NS + 'br'
+_W_CR = _W_NS + 'cr'
+_W_TBL = _W_NS + 'tbl'
+_W_TR = _W_NS + 'tr'
+_W_TC = _W_NS + 'tc'
+_W_R = _W_NS + 'r'
+# Markup-compatibility fallback (duplicate legacy copy of e.g. text boxes)
+_MC_FALLBACK = '{http://schemas.openxmlformats.org/markup-compatibility/2006}Fallback'
+
+# Marks where a nested paragraph (e.g. text box content) joins its outer paragraph
+_NESTED_SEP = '\x00'
+_NESTED_SEP_RE = re.compile(r' *\x00 *')
+
+def _join_runs(runs):
+    text = ''.join(runs)
+    if _NESTED_SEP in text:
+        text = _NESTED_SEP_RE.sub(' ', text).strip(' ')
+    return text
+
+def iter_docx_text(docx_file):
+    """
+    Streams text out of a DOCX file without building the python-docx object model.
+    Iterparses word/document.xml straight from the zip and yields one string per
+    paragraph, or one " | "-joined string per table row, in document order.
+    Text box paragraphs are folded into the paragraph that anchors them.
+    Parsed elements are discarded as soon as they are consumed so memory stays bounded.
+    """
+    with zipfile.ZipFile(docx_file) as archive:
+        with archive.open('word/document.xml') as xml_file:
+            body = None
+            table_depth = 0
+            fallback_depth = 0
+            run_depth = 0    # only w:t/w:tab/w:br inside a run are content (not tab stops in w:pPr)
+            paragraphs = []  # run buffers of the open (possibly nested) paragraphs
+            cell_paras = []  # paragraphs of the current (outermost) table cell
+            row_cells = []   # cells of the current (outermost) table row
+
+            for event, elem in ET.iterparse(xml_file, events=('start', 'end')):
+                tag = elem.tag
+
+                # Skip mc:Fallback subtrees; the mc:Choice copy has the same text
+                if tag == _MC_FALLBACK:
+                    fallback_depth += 1 if event == 'start' else -1
+                    if event == 'end':
+                        elem.clear()
+                    continue
+                if fallback_depth:
+                    continue
+
+                if event == 'start':
+                    if tag == _W_P:
+                        paragraphs.append([])
+                    elif tag == _W_R:
+                        run_depth += 1
+                    elif tag == _W_TBL:
+                        table_depth += 1
+                    elif tag == _W_BODY:
+                        body = elem
+                    continue
+
+                runs = paragraphs[-1] if paragraphs and run_depth else None
+                if tag == _W_R:
+                    run_depth -= 1
+                elif tag == _W_T:
+                    if runs is not None:
+                        runs.append(elem.text or '')
+                elif tag == _W_TAB:
+                    if runs is not None:
+                        runs.append('\t')
+                elif tag in (_W_BR, _W_CR):
+                    if runs is not None:
+                        runs.append('\n')
+                elif tag == _W_P:
+                    text = _join_runs(paragraphs.pop())
+                    if paragraphs:
+                        if text.strip():
+                            paragraphs[-1].append(_NESTED_SEP + text.strip() + _NESTED_SEP)
+                    elif table_depth:
+                        if text.strip():
+                            cell_paras.append(text.strip())
+                    else:
+                        yield text
+                    elem.clear()
+                # Nested tables are flattened into the enclosing outer cell
+                elif tag == _W_TC and table_depth == 1:
+                    row_cells.append(' '.join(cell_paras))
+                    cell_paras = []
+                    elem.clear()
+                elif tag == _W_TR and table_depth == 1:
+                    if any(row_cells):
+                        yield ' | '.join(row_cells)
+                    row_cells = []
+                    elem.clear()
+                elif tag == _W_TBL:
+                    table_depth -= 1
+                    elem.clear()
+
+                # Drop finished top-level blocks so the tree never grows
+                if body is not None and table_depth == 0 and not paragraphs and tag in (_W_P, _W_TBL):
+                    body.clear()
+
+def _read_upload_bytes(uploaded_file):
+    """
+    Returns the raw bytes of an uploaded file (Streamlit UploadedFile or file-like object).
+    """
+    if hasattr(uploaded_file, 'getvalue'):
+        return uploaded_file.getvalue()
+    uploaded_file.seek(0)
+    return uploaded_file.read()
+
+def _convert_doc_with_libreoffice(soffice, src_path, tmp_dir):
+    """
+    Converts a .doc file to DOCX with LibreOffice and returns the output path,
+    or None if the conversion failed. A private user profile inside tmp_dir keeps
+    concurrent conversions from clashing over the shared default profile.
+    """
+    profile_uri = pathlib.Path(tmp_dir, 'lo_profile').as_uri()
+    try:
+        subprocess.run(
+            [soffice, f'-env:UserInstallation={profile_uri}', '--headless',
+             '--convert-to', 'docx', '--outdir', tmp_dir, src_path],
+            check=True, capture_output=True, timeout=120,
+        )
+    except (subprocess.SubprocessError, OSError) as e:
+        print(f"LibreOffice conversion failed: {e}")
+        return None
+
+    docx_path = os.path.splitext(src_path)[0] + '.docx'
+    if not os.path.exists(docx_path):
+        print("LibreOffice conversion produced no output.")
+        return None
+    return docx_path
+
+def iter_doc_text(doc_file):
+    """
+    Extracts text from a legacy .doc file using a locally installed converter.
+    Prefers LibreOffice (converted to DOCX and streamed through iter_docx_text),
+    falling back to antiword if LibreOffice is missing or fails.
+    Raises RuntimeError if no converter succeeds.
+    """
+    data = _read_upload_bytes(doc_file)
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        src_path = os.path.join(tmp_dir, 'input.doc')
+        with open(src_path, 'wb') as f:
+            f.write(data)
+
+        soffice = shutil.which('soffice') or shutil.which('libreoffice')
+        if soffice:
+            docx_path = _convert_doc_with_libreoffice(soffice, src_path, tmp_dir)
+            if docx_path:
+                yield from iter_docx_text(docx_path)
+                return
+
+        antiword = shutil.which('antiword')
+        if antiword:
+            result = subprocess.run(
+                [antiword, src_path], check=True, capture_output=True, timeout=120,
+            )
+            for line in result.stdout.decode('utf-8', errors='replace').splitlines():
+                yield line
+            return
+
+    raise RuntimeError("Legacy .doc files require a working LibreOffice (soffice) or antiword installation.")
+
+# Target size of the pseudo-pages that DOCX/DOC text is grouped into
+PSEUDO_PAGE_CHARS = 3000
+
+def _iter_pseudo_pages(paragraphs, page_chars=PSEUDO_PAGE_CHARS):
+    """
+    Groups streamed paragraphs into pages of about page_chars characters, split at
+    paragraph boundaries. Paragraphs longer than a page are split at whitespace.
+    """
+    page = []
+    size = 0
+    for paragraph in paragraphs:
+        while len(paragraph) > page_chars:
+            if page:
+                yield "\n".join(page)
+                page, size = [], 0
+            cut = paragraph.rfind(' ', 0, page_chars)
+            cut = cut if cut > 0 else page_chars
+            yield paragraph[:cut]
+            paragraph = paragraph[cut:].lstrip(' ')
+        if page and size + len(paragraph) > page_chars:
+            yield "\n".join(page)
+            page, size = [], 0
+        page.append(paragraph)
+        size += len(paragraph) + 1
+    if page:
+        yield "\n".join(page)
+
+def iter_file_pages(uploaded_file):
+    """
+    Yields the text of an uploaded file page by page.
+    PDFs yield one string per page; DOCX and DOC files have no fixed pagination,
+    so their paragraphs are streamed into pseudo-pages of about PSEUDO_PAGE_CHARS characters.
+    """
+    file_extension = uploaded_file.name.split('.')[-1].lower()
+
+    if file_extension == 'pdf':
+        import PyPDF2
+        pdf_reader = PyPDF2.PdfReader(uploaded_file)
+        for page in pdf_reader.pages:
+            yield page.extract_text()
+    elif file_extension in ['docx', 'doc']:
+        paragraphs = iter_docx_text(uploaded_file) if file_extension == 'docx' else iter_doc_text(uploaded_file)
+        yield from _iter_pseudo_pages(paragraphs)
 
 def extract_text_from_files(uploaded_files):
     """
-    Extracts text from a list of uploaded files (PDF or DOCX).
+    Extracts text from a list of uploaded files (PDF, DOCX or legacy DOC).
     Returns a combined string of text and a list of filenames.
     """
-    combined_text = ""
+    parts = []
     filenames = []
     
     for uploaded_file in uploaded_files:
         filenames.append(uploaded_file.name)
-        file_extension = uploaded_file.name.split('.')[-1].lower()
-        
         try:
-            if file_extension == 'pdf':
-                pdf_reader = PyPDF2.PdfReader(uploaded_file)
-                for page in pdf_reader.pages:
-                    combined_text += page.extract_text() + "\n"
-            elif file_extension in ['docx', 'doc']:
-                doc = docx.Document(uploaded_file)
-                for para in doc.paragraphs:
-                    combined_text += para.text + "\n"
+            for page in iter_file_pages(uploaded_file):
+                parts.append(page)
+                parts.append("\n")
+        except Exception as e:
+            print(f"Error reading {uploaded_file.name}: {e}")
+            
+    return "".join(parts), filenames
+
+def build_text_store(uploaded_files):
+    """
+    Extracts text from a list of uploaded files into a memory-mapped TextStore,
+    indexed per paper and per page. Returns the finalized store and a list of filenames.
+    """
+    from text_store import TextStore
+
+    store = TextStore()
+    for uploaded_file in uploaded_files:
+        try:
+            store.add_paper(uploaded_file.name, iter_file_pages(uploaded_file))
         except Exception as e:
             print(f"Error reading {uploaded_file.name}: {e}")
             
-    return combined_text, filenames
+    return store.finalize(), list(store.names)
 
-def get_gemini_response(prompt, text_input, api_key):
+def get_gemini_response(prompt, text_input, api_key, task="default", usage=None):
     """
     Sends a prompt and text input to Google Gemini and returns the response.
+    The model is chosen per task type by model_router.model_for_task. If a
+    UsageTracker is given, its token usage and latency are recorded, and
+    BudgetExceeded is raised if the request would exceed the session budget.
     """
     if not api_key:
         return "Please provide a valid Google Gemini API Key."
+
+    model_name = model_for_task(task)
+    if usage is not None:
+        refusal = usage.check(estimate_tokens(prompt, text_input))
+        if refusal:
+            raise BudgetExceeded(refusal)
         
+    start = time.perf_counter()
     try:
+        import google.generativeai as genai
         genai.configure(api_key=api_key)
-        model = genai.GenerativeModel('gemini-2.5-flash')
+        model = genai.GenerativeModel(model_name)
         response = model.generate_content([prompt, text_input])
-        return response.text
+        response_text = response.text
     except Exception as e:
+        if usage is not None:
+            usage.record(task, model_name, time.perf_counter() - start, error=True)
         return f"Error accessing Gemini API: {str(e)}"
 
-def generate_research_gap_table(text, api_key):
+    if usage is not None:
+        metadata = getattr(response, 'usage_metadata', None)
+        usage.record(
+            task, model_name, time.perf_counter() - start,
+            prompt_tokens=getattr(metadata, 'prompt_token_count', 0) or 0,
+            output_tokens=getattr(metadata, 'candidates_token_count', 0) or 0,
+        )
+    return response_text
+
+def generate_research_gap_table(text, api_key, usage=None):
     """
     Generates a research gap table from the provided text using Gemini.
     Returns a Pandas DataFrame.
@@ -75,7 +327,8 @@ def generate_research_gap_table(text, api_key):
     - Create one row per uploaded paper (not per referenced paper).
     """
     
-    response_text = get_gemini_response(prompt, text, api_key)
+    response_text = get_gemini_response(prompt, text, api_key, task="gap_table", usage=usage)
+    import pandas as pd
     
     # Parse markdown table to DataFrame
     try:
@@ -116,7 +369,7 @@ def generate_research_gap_table(text, api_key):
     except Exception as e:
         return pd.DataFrame({"Error": [f"Failed to parse table: {str(e)}"], "Raw Response": [response_text]})
 
-def answer_question(context, question, api_key):
+def answer_question(context, question, api_key, usage=None):
     """
     Answers a user question based on the provided context.
     """
@@ -130,9 +383,9 @@ def answer_question(context, question, api_key):
     
     Answer:
     """
-    return get_gemini_response(prompt, "", api_key)
+    return get_gemini_response(prompt, "", api_key, task="qa", usage=usage)
 
-def validate_research_paper(text, api_key):
+def validate_research_paper(text, api_key, usage=None):
     """
     Validates if the provided text is likely a research paper.
     Checks for key sections like Abstract, Introduction, References, etc.
@@ -157,11 +410,11 @@ def validate_research_paper(text, api_key):
     Is this a research paper? Answer ONLY "YES" or "NO".
     """
     
-    response = get_gemini_response(prompt, "", api_key)
+    response = get_gemini_response(prompt, "", api_key, task="validation", usage=usage)
     return "YES" in response.strip().upper()
 
 
-def generate_concise_table(df, api_key):
+def generate_concise_table(df, api_key, usage=None):
     """
     Generates a concise version of the research gap table by condensing content.
     Combines Reference and Year columns, removes Gaps/Notes and Research Gap/Limitations columns.
@@ -191,7 +444,8 @@ def generate_concise_table(df, api_key):
     | [1] Author et al., 2023 | Brief aim | Brief method | Brief tools | Brief findings | Brief relevance |
     """
     
-    response_text = get_gemini_response(prompt, "", api_key)
+    response_text = get_gemini_response(prompt, "", api_key, task="concise_table", usage=usage)
+    import pandas as pd
     
     # Parse the condensed table
     try:
@@ -227,19 +481,18 @@ def generate_concise_table(df, api_key):
         return df  # Return original on error
 
 
-from reportlab.lib.pagesizes import letter, landscape
-from reportlab.lib import colors
-from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer
-from reportlab.lib.styles import getSampleStyleSheet
-
 def create_pdf_download(df):
     """
     Creates a PDF file from the DataFrame with text wrapping and landscape orientation.
     """
+    from reportlab.lib import colors
+    from reportlab.lib.pagesizes import A3, landscape
+    from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer
+    from reportlab.lib.styles import getSampleStyleSheet
+
     buffer = io.BytesIO()
     # Use A3 Landscape for more space (approx 1190 x 842 points)
     # Margins: 30 points each side
-    from reportlab.lib.pagesizes import A3
     doc = SimpleDocTemplate(buffer, pagesize=landscape(A3), rightMargin=30, leftMargin=30, topMargin=30, bottomMargin=30)
     elements = []
     
@@ -322,6 +575,7 @@ def create_docx_download(df):
     """
     Creates a DOCX file from the DataFrame.
     """
+    import docx
     doc = docx.Document()
     doc.add_heading('Research Gap Analysis', 0)
     
@@ -345,7 +599,200 @@ def create_docx_download(df):
     buffer.seek(0)
     return buffer
 
-def generate_literature_review(text, api_key):
+# Rows per chunk for the columnar exports (CSV, Parquet, XLSX)
+EXPORT_CHUNK_ROWS = 1000
+
+# Excel limits: rows per worksheet (including header) and characters per cell
+_XLSX_MAX_ROWS = 1048576
+_XLSX_MAX_CELL_CHARS = 32767
+
+def _iter_export_chunks(data, chunk_size=EXPORT_CHUNK_ROWS):
+    """
+    Yields string-typed DataFrame chunks of at most chunk_size rows, with string
+    column labels and missing values as empty strings.
+    Accepts a single DataFrame or any iterable of DataFrames (e.g. one per project),
+    so large aggregated tables never have to be concatenated in memory.
+    """
+    import pandas as pd
+
+    frames = [data] if isinstance(data, pd.DataFrame) else data
+    for frame in frames:
+        starts = range(0, len(frame), chunk_size) if len(frame) else [0]
+        for start in starts:
+            chunk = frame.iloc[start:start + chunk_size].fillna('').astype(str)
+            chunk.columns = [str(c) for c in chunk.columns]
+            yield chunk
+
+def _align_chunk(chunk, columns, drop_extra=False):
+    """
+    Reorders a chunk to the export's columns, filling columns it lacks with empty strings.
+    Raises ValueError if the chunk has columns the export doesn't, unless drop_extra is set.
+    """
+    extra = [c for c in chunk.columns if c not in columns]
+    if extra and not drop_extra:
+        raise ValueError(f"Columns {extra} are not in the export's columns {list(columns)}; "
+                         "pass drop_extra=True to discard them.")
+    return chunk.reindex(columns=columns, fill_value='')
+
+def _read_csv_header(path):
+    """
+    Returns the header row of an existing CSV file, or None if it is missing or empty.
+    """
+    import csv
+
+    if not os.path.exists(path) or os.path.getsize(path) == 0:
+        return None
+    with open(path, newline='', encoding='utf-8') as f:
+        return next(csv.reader(f), None)
+
+def write_csv_export(data, target, append=False, drop_extra=False, chunk_size=EXPORT_CHUNK_ROWS):
+    """
+    Streams a gap table to CSV in chunks. target is a file path or a binary file object.
+    With append=True and an existing file, rows are aligned to the existing header and
+    added to the end so results accumulate across runs. Columns missing from the
+    header raise ValueError unless drop_extra=True.
+    """
+    columns = _read_csv_header(target) if append and isinstance(target, str) else None
+    write_header = columns is None
+
+    if isinstance(target, str):
+        stream = open(target, 'a' if append else 'w', newline='', encoding='utf-8')
+    else:
+        stream = io.TextIOWrapper(target, encoding='utf-8', newline='')
+
+    try:
+        for chunk in _iter_export_chunks(data, chunk_size):
+            if columns is None:
+                columns = list(chunk.columns)
+            else:
+                chunk = _align_chunk(chunk, columns, drop_extra)
+            chunk.to_csv(stream, header=write_header, index=False)
+            write_header = False
+    finally:
+        if isinstance(target, str):
+            stream.close()
+        else:
+            stream.flush()
+            stream.detach()
+
+def write_parquet_export(data, target, drop_extra=False, columns=None, chunk_size=EXPORT_CHUNK_ROWS):
+    """
+    Streams a gap table to a Parquet file, one row group per chunk.
+    target is a file path or a binary file object. All columns are stored as strings.
+    The columns are those of the first chunk unless given explicitly; chunks with other
+    columns raise ValueError unless drop_extra=True.
+    """
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    writer = None
+    try:
+        for chunk in _iter_export_chunks(data, chunk_size):
+            if columns is None:
+                columns = list(chunk.columns)
+            else:
+                chunk = _align_chunk(chunk, columns, drop_extra)
+            if writer is None:
+                schema = pa.schema([(c, pa.string()) for c in columns])
+                writer = pq.ParquetWriter(target, schema)
+            writer.write_table(pa.Table.from_pandas(chunk, schema=schema, preserve_index=False))
+    finally:
+        if writer is not None:
+            writer.close()
+
+def append_parquet_export(data, directory, drop_extra=False, chunk_size=EXPORT_CHUNK_ROWS):
+    """
+    Appends a gap table to a Parquet dataset directory by writing a new part file.
+    The directory can be queried as a single table with pyarrow.dataset, DuckDB or Spark.
+    If the directory already has part files, rows are aligned to their columns and
+    new columns raise ValueError unless drop_extra=True.
+    Returns the path of the written part file.
+    """
+    import uuid
+    import pyarrow.parquet as pq
+
+    os.makedirs(directory, exist_ok=True)
+    existing = sorted(f for f in os.listdir(directory) if f.endswith('.parquet'))
+    columns = pq.read_schema(os.path.join(directory, existing[0])).names if existing else None
+
+    name = f"gap_table-{time.strftime('%Y%m%d-%H%M%S')}-{uuid.uuid4().hex[:8]}.parquet"
+    path = os.path.join(directory, name)
+    write_parquet_export(data, path, drop_extra, columns, chunk_size)
+    return path
+
+def write_xlsx_export(data, target, drop_extra=False, chunk_size=EXPORT_CHUNK_ROWS):
+    """
+    Streams a gap table to XLSX using XlsxWriter's constant-memory mode.
+    target is a file path or a binary file object. Rows beyond Excel's sheet limit
+    continue on additional worksheets with the header repeated. Later chunks with
+    columns the first chunk lacks raise ValueError unless drop_extra=True.
+    """
+    import xlsxwriter
+
+    # Cell text comes from papers and the LLM: never interpret it as formulas or links
+    workbook = xlsxwriter.Workbook(target, {
+        'constant_memory': True,
+        'strings_to_formulas': False,
+        'strings_to_urls': False,
+    })
+    header_format = workbook.add_format({'bold': True, 'text_wrap': True, 'valign': 'top'})
+    cell_format = workbook.add_format({'text_wrap': True, 'valign': 'top'})
+
+    worksheet = None
+    columns = None
+    row_idx = 0
+    try:
+        for chunk in _iter_export_chunks(data, chunk_size):
+            if columns is None:
+                columns = list(chunk.columns)
+            else:
+                chunk = _align_chunk(chunk, columns, drop_extra)
+
+            for row in chunk.itertuples(index=False, name=None):
+                if worksheet is None or row_idx >= _XLSX_MAX_ROWS:
+                    sheet_num = len(workbook.worksheets()) + 1
+                    worksheet = workbook.add_worksheet(f"Research Gaps {sheet_num}" if sheet_num > 1 else "Research Gaps")
+                    worksheet.set_column(0, len(columns) - 1, 40)
+                    worksheet.write_row(0, 0, columns, header_format)
+                    row_idx = 1
+                worksheet.write_row(row_idx, 0, [v[:_XLSX_MAX_CELL_CHARS] for v in row], cell_format)
+                row_idx += 1
+
+        if worksheet is None:
+            worksheet = workbook.add_worksheet("Research Gaps")
+            if columns:
+                worksheet.write_row(0, 0, columns, header_format)
+    finally:
+        workbook.close()
+
+def create_csv_download(df):
+    """
+    Creates a CSV file from the DataFrame.
+    """
+    buffer = io.BytesIO()
+    write_csv_export(df, buffer)
+    buffer.seek(0)
+    return buffer
+
+def create_parquet_download(df):
+    """
+    Creates a Parquet file from the DataFrame.
+    """
+    buffer = io.BytesIO()
+    write_parquet_export(df, buffer)
+    buffer.seek(0)
+    return buffer
+
+def create_xlsx_download(df):
+    """
+    Creates an XLSX file from the DataFrame.
+    """
+    buffer = io.BytesIO()
+    write_xlsx_export(df, buffer)
+    buffer.seek(0)
+    return buffer
+
+def generate_literature_review(text, api_key, usage=None):
     """
     Generates a literature review from the provided text using Gemini.
     """
@@ -366,12 +813,13 @@ def generate_literature_review(text, api_key):
     - Ensure the review is coherent and flows logically.
     """
     
-    return get_gemini_response(prompt, text, api_key)
+    return get_gemini_response(prompt, text, api_key, task="literature_review", usage=usage)
 
 def create_review_docx(review_text):
     """
     Creates a DOCX file for the literature review.
     """
+    import docx
     doc = docx.Document()
     doc.add_heading('Literature Review', 0)
     